@@ -30,7 +30,7 @@ class Experiment():
             legal_actions = list(state.legal_actions())
 
             policy_probs = {
-                name: p['policy'].action_likelihoods(state) 
+                name: p.policy.action_likelihoods(state) 
                 for name, p in self.policies.items()
             }
 
@@ -66,7 +66,7 @@ class Experiment():
             
             policy_max_actions = {}
             for name, policy in self.policies.items():
-                probs = policy['policy'].action_likelihoods(state)
+                probs = policy.policy.action_likelihoods(state)
                     
                 if probs:
                     best_action = max(probs, key=probs.get)
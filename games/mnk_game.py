@@ -2,6 +2,11 @@ import numpy as np
 import pyspiel
 
 class MNKGameState:
+    # False while _board/_returns/_stones may be shared with a clone (copy-on-write); also covers states pickled without the flag
+    _board_owned = False
+    # Per-player stone bitboards (bit r*cols + c); None on states pickled before they existed
+    _stones = None
+
     def __init__(self, game, board_shape, rules):
         # REMOVED: super().__init__(game) -> caused the crash
         self._game = game
@@ -9,7 +14,9 @@ class MNKGameState:
         self._rules = rules
         
         # Board: -1=empty, 0=Player1 (X), 1=Player2 (O)
-        self._board = np.full(board_shape, -1, dtype=int)
+        self._board = np.full(board_shape, -1, dtype=np.int8)
+        self._stones = [0, 0]
+        self._board_owned = True
         
         self._current_player = 0
         self._game_over = False
@@ -30,16 +37,25 @@ class MNKGameState:
 
     def legal_actions(self):
         if self._game_over: return []
-        return [i for i, val in enumerate(self._board.flatten()) if val == -1]
+        return np.flatnonzero(self._board.ravel() == -1).tolist()
 
     def apply_action(self, action):
+        # Policies may hand back NumPy integers; the stone bitboards must stay arbitrary-precision Python ints
+        action = int(action)
         if self._game_over:
             raise RuntimeError("Cannot apply action to terminal state")
 
+        if not self._board_owned:
+            self._board = self._board.copy()
+            self._returns = list(self._returns)
+            self._stones = list(self._stones) if self._stones is not None else self._stones_from_board()
+            self._board_owned = True
+
         row = action // self._cols
         col = action % self._cols
         
         self._board[row, col] = self._current_player
+        self._stones[self._current_player] |= 1 << action
         self._move_count += 1
         self._moves_remaining_in_turn -= 1
 
@@ -53,7 +69,7 @@ class MNKGameState:
             elif outcome == -1: # Loss (Misere)
                 self._returns[self._current_player] = -1.0
                 self._returns[1 - self._current_player] = 1.0
-        elif np.all(self._board != -1):
+        elif self._move_count >= self._rows * self._cols:
             self._game_over = True
             self._returns = [0.0, 0.0] # Draw
         
@@ -62,48 +78,57 @@ class MNKGameState:
             self._moves_remaining_in_turn = self._get_opening_moves(self._current_player)
 
     def _check_outcome(self, player):
+        # Bit-parallel line check: for each direction, AND the stones with themselves shifted back
+        # 1..k-1 steps; a bit surviving at a valid line start means k in a row from that cell
+        stones = self._stones[player]
         target_k = self._game.get_win_length(player)
-        valid_dirs = self._game.get_valid_directions(player)
-        is_misere = self._rules.get("misere", False)
-
-        for r in range(self._rows):
-            for c in range(self._cols):
-                if self._board[r, c] != player: continue
-                
-                for dr, dc in valid_dirs:
-                    if self._check_line(r, c, dr, dc, player, target_k):
-                        return -1 if is_misere else 1
+        for step, starts in self._game.get_win_masks(player):
+            b = stones & starts
+            for i in range(1, target_k):
+                if not b: break
+                b &= stones >> (i * step)
+            if b:
+                return -1 if self._rules.get("misere", False) else 1
         return None
 
-    def _check_line(self, r, c, dr, dc, player, k):
-        for i in range(k):
-            rr, cc = r + i * dr, c + i * dc
-            if not (0 <= rr < self._rows and 0 <= cc < self._cols): return False
-            if self._board[rr, cc] != player: return False
-        return True
+    def _stones_from_board(self):
+        flat = self._board.ravel()
+        return [sum(1 << int(i) for i in np.flatnonzero(flat == p)) for p in (0, 1)]
 
     def observation_tensor(self, player_id=None):
         # Note: pyspiel signature sometimes includes player_id
-        obs = np.zeros((3, self._rows, self._cols))
-        for r in range(self._rows):
-            for c in range(self._cols):
-                p = self._board[r, c]
-                if p == 0: obs[0, r, c] = 1
-                elif p == 1: obs[1, r, c] = 1
-        return obs.flatten()
+        # Planes: 0 = Player1 (X), 1 = Player2 (O); plane 2 is left zeroed (callers index into it)
+        obs = np.zeros((3, self._rows, self._cols), dtype=np.float32)
+        obs[0] = self._board == 0
+        obs[1] = self._board == 1
+        return obs.ravel()
 
     def clone(self):
-        new_state = MNKGameState(self._game, (self._rows, self._cols), self._rules)
-        new_state._board = self._board.copy()
-        new_state._current_player = self._current_player
-        new_state._game_over = self._game_over
-        new_state._returns = list(self._returns)
-        new_state._move_count = self._move_count
-        new_state._moves_remaining_in_turn = self._moves_remaining_in_turn
+        # Shares _board/_returns with self; whichever state applies an action next copies them first
+        new_state = object.__new__(type(self))
+        new_state.__dict__.update(self.__dict__)
+        self._board_owned = False
+        new_state._board_owned = False
         return new_state
     
     def returns(self): return self._returns
     def is_terminal(self): return self._game_over
+
+    # --- Pickling: ship the board as raw int8 bytes rather than a pickled ndarray ---
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_board'] = self._board.astype(np.int8, copy=False).tobytes()
+        state.pop('_board_owned', None)
+        return state
+
+    def __setstate__(self, state):
+        board = state['_board']
+        if isinstance(board, bytes):
+            state = dict(state)
+            state['_board'] = np.frombuffer(board, dtype=np.int8).reshape(state['_rows'], state['_cols'])
+        # _board_owned stays at the class default (False): the read-only board and any lists shared
+        # with other unpickled states are copied on the first apply_action
+        self.__dict__.update(state)
     
     # --- String Representation Helpers (Required for Sampler) ---
     def __str__(self):
@@ -120,11 +145,18 @@ class MNKGameState:
 
 
 class MNKGame: # Removed pyspiel.Game
+    # Per-player win bitmasks and rule lookups; None until built (also covers games pickled before they existed)
+    _win_masks = None
+    _win_lengths = None
+    _directions = None
+
     def __init__(self, m=3, n=3, k=3, rules=None):
         self._m = m
         self._n = n
         self._base_k = k
         self._rules = rules if rules else {}
+        self._win_lengths = (self._compute_win_length(0), self._compute_win_length(1))
+        self._directions = (self._compute_directions(0), self._compute_directions(1))
         
         # Validation
         k0 = self.get_win_length(0)
@@ -134,6 +166,8 @@ class MNKGame: # Removed pyspiel.Game
              if max(m, n) < max_k_needed:
                  raise ValueError(f"Grid size ({m}x{n}) too small for K={max_k_needed}")
 
+        self._win_masks = (self._build_win_masks(0), self._build_win_masks(1))
+
     def new_initial_state(self):
         return MNKGameState(self, (self._m, self._n), self._rules)
 
@@ -143,12 +177,86 @@ class MNKGame: # Removed pyspiel.Game
 
     # --- Rule Helpers ---
     def get_win_length(self, player_id):
+        if self._win_lengths is None:
+            self._win_lengths = (self._compute_win_length(0), self._compute_win_length(1))
+        return self._win_lengths[player_id]
+
+    def get_valid_directions(self, player_id):
+        """(dr, dc) steps player_id's lines may run along, as a tuple shared by all callers."""
+        if self._directions is None:
+            self._directions = (self._compute_directions(0), self._compute_directions(1))
+        return self._directions[player_id]
+
+    def _compute_win_length(self, player_id):
         extra = self._rules.get(f"p{player_id}_extra_k", 0)
         return self._base_k + extra
 
-    def get_valid_directions(self, player_id):
+    def _compute_directions(self, player_id):
         default_keys = ["h", "v", "d1", "d2"]
         allowed_map = self._rules.get("allowed_directions", {})
         keys = allowed_map.get(player_id, default_keys)
         mapping = {"h": (0, 1), "v": (1, 0), "d1": (1, 1), "d2": (1, -1)}
-        return [mapping[k] for k in keys if k in mapping]
\ No newline at end of file
+        return tuple(mapping[k] for k in keys if k in mapping)
+
+    def board_symmetries(self):
+        """
+        Board symmetries that preserve the rules, as an int array of shape (num_symmetries, m*n): row s is a
+        permutation with transformed_flat_board = flat_board[perms[s]]. Identity comes first. Rotations and
+        reflections are kept only if they map every player's allowed directions onto themselves
+        (e.g. a 90 degree rotation swaps "h" and "v"); transposing symmetries need a square board.
+        """
+        m, n = self._m, self._n
+        # (cell map, direction map) pairs; directions only need their linear part
+        candidates = [
+            (lambda r, c: (r, c), lambda dr, dc: (dr, dc)),
+            (lambda r, c: (m - 1 - r, c), lambda dr, dc: (-dr, dc)),
+            (lambda r, c: (r, n - 1 - c), lambda dr, dc: (dr, -dc)),
+            (lambda r, c: (m - 1 - r, n - 1 - c), lambda dr, dc: (-dr, -dc)),
+        ]
+        if m == n:
+            candidates += [
+                (lambda r, c: (c, r), lambda dr, dc: (dc, dr)),
+                (lambda r, c: (n - 1 - c, m - 1 - r), lambda dr, dc: (-dc, -dr)),
+                (lambda r, c: (c, m - 1 - r), lambda dr, dc: (dc, -dr)),
+                (lambda r, c: (n - 1 - c, r), lambda dr, dc: (-dc, dr)),
+            ]
+
+        def line(dr, dc):
+            # A direction and its reverse describe the same lines
+            return (dr, dc) if (dr, dc) > (0, 0) else (-dr, -dc)
+
+        perms = []
+        for cell_map, dir_map in candidates:
+            if any({line(*dir_map(dr, dc)) for dr, dc in dirs} != {line(dr, dc) for dr, dc in dirs}
+                   for dirs in (self.get_valid_directions(0), self.get_valid_directions(1))):
+                continue
+            perm = np.empty(m * n, dtype=np.intp)
+            for r in range(m):
+                for c in range(n):
+                    tr, tc = cell_map(r, c)
+                    perm[tr * n + tc] = r * n + c
+            perms.append(perm)
+        return np.array(perms)
+
+    def get_win_masks(self, player_id):
+        """
+        Bitboard win patterns for player_id (bit r*n + c): one (step, starts) pair per allowed direction, where
+        step is the bit distance between neighbouring cells along it and starts has a bit set for every cell
+        whose k-line in that direction fits on the board (so shifted bits can never wrap across rows).
+        """
+        if self._win_masks is None:
+            self._win_masks = (self._build_win_masks(0), self._build_win_masks(1))
+        return self._win_masks[player_id]
+
+    def _build_win_masks(self, player_id):
+        k = self.get_win_length(player_id)
+        masks = []
+        for dr, dc in self.get_valid_directions(player_id):
+            starts = 0
+            for r in range(self._m):
+                for c in range(self._n):
+                    end_r, end_c = r + (k - 1) * dr, c + (k - 1) * dc
+                    if 0 <= end_r < self._m and 0 <= end_c < self._n:
+                        starts |= 1 << (r * self._n + c)
+            masks.append((dr * self._n + dc, starts))
+        return masks
\ No newline at end of file
@@ -6,8 +6,9 @@ import numpy as np
 
 
 def softmax(x):
-    e = np.exp(x - np.max(x))   # subtract max for numerical stability
-    return e / np.sum(e)
+    # Normalise in log space (log-sum-exp) so long histories of large negative log-likelihoods stay stable
+    m = np.max(x)
+    return np.exp(x - (m + np.log(np.sum(np.exp(x - m)))))
 
 class OpponentInference:
     def __init__(self, candidate_policies, method="log_likelihood"):
@@ -23,16 +24,18 @@ class OpponentInference:
 
 
     def log_likelihoods(self, state_action_history) -> Dict[str, float]:
-        # Implementation here
-        log_likelihoods = {}
-        for policy_name, policy in self.candidate_policies.items():
-            log_likelihoods.setdefault(policy_name, 0.0)
-            for state_action in state_action_history:
-                state, action = state_action
-                log_likelihoods[policy_name] += np.log(policy.action_likelihoods(state).get(action, 1e-5))
-                # Compute log likelihoods based on policy
+        states = [state for state, _ in state_action_history]
+        actions = [action for _, action in state_action_history]
+
+        # likelihoods[i, t] = p(actions[t] | states[t], policy i)
+        likelihoods = np.array([
+            [probs.get(action, 1e-5) for probs, action in zip(policy.action_likelihoods_batch(states), actions)]
+            for policy in self.candidate_policies.values()
+        ]).reshape(len(self.candidate_policies), len(actions))
+        # Clamp zero-probability actions so a single log(0) can't send a candidate to -inf
+        log_likelihoods = np.log(np.maximum(likelihoods, 1e-30)).sum(axis=1)
 
-        policy_probs = self.softmax_probs(log_likelihoods)        
+        policy_probs = self.softmax_probs(dict(zip(self.candidate_policies, log_likelihoods)))
         return policy_probs
 
 
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List
 import numpy as np
 import pyspiel
 
@@ -19,6 +19,12 @@ class GamePolicy(ABC):
     def action_likelihoods(self, state: pyspiel.State) -> Dict[int, float]:
         pass
     
+    def action_likelihoods_batch(self, states: List[pyspiel.State]) -> List[Dict[int, float]]:
+        """
+        Likelihoods for several states at once. Policies that can score states together should override this.
+        """
+        return [self.action_likelihoods(state) for state in states]
+
     @abstractmethod
     def step(self, state: pyspiel.State) -> int:
         pass
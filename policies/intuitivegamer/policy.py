@@ -151,8 +151,9 @@ class IntuitiveGamerPolicy(GamePolicy):
         return float(longest_opp - 0.5)
 
     def action_likelihoods(self, state: pyspiel.State) -> Dict[int, float]:
-        likelihoods = {}
-        for action in state.legal_actions():
+        actions = state.legal_actions()
+        scores = []
+        for action in actions:
             d = self._uaux(state, action)
             n1 = self._uself(state, action)
             n2 = self._uopp(state, action)
@@ -163,14 +164,11 @@ class IntuitiveGamerPolicy(GamePolicy):
             score = np.power(2, val)
 
             # score = np.power(2, (1 - d) + n1 + n2)
-            likelihoods[action] = score
+            scores.append(score)
         
-        values = np.array(list(likelihoods.values()))
-        probs = softmax(values)
-        for i, action in enumerate(likelihoods.keys()):
-            likelihoods[action] = probs[i]
-
-        return likelihoods
+        if not actions:
+            return {}
+        return dict(zip(actions, softmax(np.array(scores))))
     
     def step(self, state):
         if self.opponent_inference:
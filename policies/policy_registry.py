@@ -1,27 +1,45 @@
 """
 Evaluator registry for managing different evaluation metrics.
+
+Policy modules are imported on first use, so importing the registry (e.g. to list
+POLICY_REGISTRY's names) doesn't pull in every policy implementation.
 """
 
+import importlib
 from typing import Dict, Any
-from .intuitivegamer.policy import IntuitiveGamerPolicy
-from .random.policy import RandomPolicy
-from .mcts.policy import MCTSAgent
-from .intuitivegamer_depth_limited.policy import DepthLimitedIGPolicy
+
+# Policy class name -> module (relative to this package) defining it
+_POLICY_MODULES = {
+    "IntuitiveGamerPolicy": ".intuitivegamer.policy",
+    "RandomPolicy": ".random.policy",
+    "MCTSAgent": ".mcts.policy",
+    "DepthLimitedIGPolicy": ".intuitivegamer_depth_limited.policy",
+}
+
+def _load_policy_class(class_name: str):
+    module = importlib.import_module(_POLICY_MODULES[class_name], __package__)
+    return getattr(module, class_name)
+
+def __getattr__(name: str):
+    # PEP 562: resolve `from policies.policy_registry import RandomPolicy` lazily
+    if name in _POLICY_MODULES:
+        return _load_policy_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-# Registry of available evaluators
+# Registry of available evaluators (name -> factory returning the policy class)
 POLICY_REGISTRY = {
-    "intuitive_gamer": IntuitiveGamerPolicy,
-    "random": RandomPolicy,
-    "mcts": MCTSAgent,
-    "intuitive_gamer_depth_limited": DepthLimitedIGPolicy,
+    "intuitive_gamer": lambda: _load_policy_class("IntuitiveGamerPolicy"),
+    "random": lambda: _load_policy_class("RandomPolicy"),
+    "mcts": lambda: _load_policy_class("MCTSAgent"),
+    "intuitive_gamer_depth_limited": lambda: _load_policy_class("DepthLimitedIGPolicy"),
 }
 
 def get_policy(name: str):
     """Get evaluator class by name."""
     if name not in POLICY_REGISTRY:
         raise KeyError(f"Unknown policy: {name}")
-    return POLICY_REGISTRY[name]
+    return POLICY_REGISTRY[name]()
 
 def instantiate_policy(policy_config: Dict[str, Any]):
     """Instantiate a policy from configuration."""
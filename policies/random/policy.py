@@ -16,8 +16,7 @@ class RandomPolicy(GamePolicy):
         if not legal_actions:
             return {}
         
-        uniform_prob = 1.0 / len(legal_actions)
-        return {action: uniform_prob for action in legal_actions}
+        return dict.fromkeys(legal_actions, 1.0 / len(legal_actions))
     
     def step(self, state):
         legal_actions = state.legal_actions()
@@ -1,50 +1,15 @@
 import yaml
 import argparse
-import pyspiel
-import os
+import logging
 from typing import List, Dict, Any
 
-# Imports for custom components
-from policies.policy_registry import instantiate_policy, POLICY_REGISTRY
-from state_dataset.dataset import GameStateView, GameStateDataset
-from utils.utils import load_game, load_policies, generate_cache_filename
+# Custom components (policies, games, state dataset) pull in pyspiel/numpy, so they are
+# imported inside the functions that use them to keep `--help` and config errors fast.
 
-
-
-def build_sampler(cfg, game, cache_file=None):
-    # Pass the game instance and cache file to the dataset generator
-    ds = GameStateDataset(game, cache_file=cache_file)
-    scfg = cfg.get("sampler",{})
-    
-    view = GameStateView(ds.all())
-    
-    print(f"Initial dataset size: {len(view)}")
-        
-    for p in scfg.get("predicates",[]):
-        try:
-            fn = p if callable(p) else eval(p)
-            view = view.where(fn)
-        except Exception as e:
-            print(f"Warning: Failed to apply predicate '{p}': {e}")
-
-    print(f"After predicates: {len(view)} items")
-
-    # read sampling parameters
-    sample_cfg = scfg.get("sample", {})
-    k = sample_cfg.get("k", 1)
-    replace = sample_cfg.get("replace", True)
-    
-    print(f"Sampling k={k}, replace={replace}")
-    
-    # Safety check for sampling
-    if not replace and k > len(view):
-        print(f"Warning: Cannot sample {k} items without replacement from {len(view)} items. Using replacement instead.")
-        replace = True
-    
-    # Attach sampling function
-    view.samples = lambda: view.sample(k=k, replace=replace)
-
-    return view
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 def run_experiment(config: Dict[str, Any]) -> None:
     """Run the full experiment based on configuration."""
@@ -59,6 +24,8 @@ def run_experiment(config: Dict[str, Any]) -> None:
 
 def run_single_game_experiment(config: Dict[str, Any]) -> None:
     """Run experiment with a single game configuration."""
+    from utils.utils import load_game, load_policies, build_sampler, generate_cache_filename
+
     # 1. Load Game
     print(f"\n{'='*50}")
     print("GAME SETUP")
@@ -89,8 +56,8 @@ def run_single_game_experiment(config: Dict[str, Any]) -> None:
     print("Creating experiment...")
     
     try:
-        # FIX: Pass 'policies' directly (the dict of dicts)
-        # analysis.py expects to access policy['policy'], so we must not strip the wrapper.
+        # FIX: Pass 'policies' directly (the dict of PolicyRecords)
+        # analysis.py expects to access policy.policy, so we must not strip the wrapper.
         exp = Experiment(policies, sampler)
         exp_one = exp.run_max_action_disagreement()
         
@@ -115,6 +82,8 @@ def run_multi_game_experiment(config: Dict[str, Any]) -> None:
     print("MULTI-GAME EXPERIMENT")
     print('='*50)
     
+    from utils.utils import load_game, load_policies, build_sampler, generate_cache_filename
+
     all_results = []
     game_names = []
     
@@ -249,10 +218,11 @@ def main():
                         help="Path to experiment configuration file")
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     try:
         with open(args.config, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
         
         run_experiment(config)
         
@@ -12,6 +12,11 @@ from policies.policy_registry import instantiate_policy
 from policies.mcts.policy import MCTSAgent
 from policies.intuitivegamer_depth_limited.policy import DepthLimitedIGPolicy
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 # --- 1. Robust Game Loader (Fixes the C++ Init Error) ---
 def load_game_safe(game_config: Dict[str, Any]) -> Any:
     game_name = game_config["name"]
@@ -44,7 +49,7 @@ def play_match(game, bot1, bot2):
 
 def run_experiment(config_path):
     with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=SafeLoader)
 
     # --- Parameter Grid ---
     ig_depths = [2, 3, 4]
@@ -7,6 +7,7 @@ across multiple game variants and collect statistics on game outcomes.
 """
 
 import argparse
+import logging
 import yaml
 import statistics
 from typing import Dict, List, Any, Tuple, Optional
@@ -16,9 +17,14 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 import pyspiel
-from utils.utils import load_game, load_policies
+from utils.utils import load_game, load_policies, PolicyRecord
 import copy
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 @dataclass
 class GameResult:
     """Result of a single game simulation."""
@@ -128,9 +134,9 @@ class GameSimulator:
         # Initialize posterior tracking for policies with posteriors
         if track_posteriors and posteriors_over_time is not None:
             for i, policy_wrapper in enumerate(current_policies):
-                policy_obj = policy_wrapper['policy'] if hasattr(policy_wrapper, '__getitem__') else policy_wrapper
+                policy_obj = policy_wrapper.policy if isinstance(policy_wrapper, PolicyRecord) else policy_wrapper
                 if hasattr(policy_obj, 'posteriors'):
-                    policy_name = policy_wrapper.get('name', f'policy_{i}') if hasattr(policy_wrapper, '__getitem__') else f'policy_{i}'
+                    policy_name = f'policy_{i}'
                     posteriors_over_time[policy_name] = []
 
 
@@ -140,9 +146,9 @@ class GameSimulator:
             # Get action from current player's policy
             if current_player >= 0 and current_player < len(current_policies):
                 policy = current_policies[current_player]
-                if hasattr(policy, 'policy'):
+                if isinstance(policy, PolicyRecord):
                     # Handle wrapped policy objects from load_policies
-                    policy_obj = policy['policy']
+                    policy_obj = policy.policy
                 else:
                     policy_obj = policy
                 
@@ -164,9 +170,9 @@ class GameSimulator:
             # Track posteriors after each action
             if track_posteriors and posteriors_over_time is not None:
                 for i, policy_wrapper in enumerate(current_policies):
-                    policy_obj = policy_wrapper['policy'] if hasattr(policy_wrapper, '__getitem__') else policy_wrapper
+                    policy_obj = policy_wrapper.policy if isinstance(policy_wrapper, PolicyRecord) else policy_wrapper
                     if hasattr(policy_obj, 'posteriors'):
-                        policy_name = policy_wrapper.get('name', f'policy_{i}') if hasattr(policy_wrapper, '__getitem__') else f'policy_{i}'
+                        policy_name = f'policy_{i}'
                         if policy_name in posteriors_over_time:
                             # Get current posteriors and store a copy
                             current_posteriors = getattr(policy_obj, 'posteriors', [])
@@ -579,10 +585,11 @@ def main():
                         help="Path to simulation configuration file")
     
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     try:
         with open(args.config, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
         
         run_simulation_experiment(config)
         
@@ -1,18 +1,27 @@
 import numpy as np
 import pyspiel
-import random
 import pickle
 import os
+import ast
+import operator
+import multiprocessing
 import yaml
 import argparse
 from tqdm import tqdm
 import sys
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 current_dir = os.path.dirname(os.path.abspath(__file__)) # .../state_dataset
 project_root = os.path.dirname(current_dir)              # .../intuitive-gamer-memo
 if project_root not in sys.path:
     sys.path.append(project_root)
 
+from games.mnk_game import MNKGameState
+
 # Default directions if game doesn't specify them
 DEFAULT_DIRECTIONS = [(1,0), (0,1), (1,1), (1,-1)] # h, v, diag, anti
 
@@ -22,6 +31,11 @@ def extract_board(state, game):
     Assumes shape (3, rows, cols) with planes: [Player(X), Opponent(O), Empty].
     Returns board where: 1=CurrentPlayer, -1=Opponent, 0=Empty.
     """
+    if isinstance(state, MNKGameState):
+        # Same planes 0 - 1 as MNKGameState.observation_tensor, read straight off the board
+        board = state._board
+        return (board == 0).astype(np.int8) - (board == 1).astype(np.int8)
+
     shape = game.observation_tensor_shape()
     obs = np.array(state.observation_tensor(state.current_player())).reshape(shape)
     
@@ -32,61 +46,72 @@ def extract_board(state, game):
     
     return me_plane - opp_plane
 
-def longest_chain(state, player_val, game):
+def _and_shifted(mask, dr, dc):
     """
-    Return max contiguous stones for `player` on board.
-    player_val: 1 for current player, -1 for opponent (relative to state.current_player)
+    Returns out[r, c] = mask[r, c] & mask[r+dr, c+dc], False where (r+dr, c+dc) is off-board.
     """
-    best = 0
-    board = extract_board(state, game)
-    rows, cols = board.shape
-    
-    # 1. Determine Player ID to fetch valid directions
-    current_p_id = state.current_player()
-    
-    if player_val == 1:
-        target_p_id = current_p_id
-    else:
-        target_p_id = 1 - current_p_id
-        
-    # 2. Get Valid Directions from Game (if supported)
+    rows, cols = mask.shape
+    out = np.zeros_like(mask)
+    r0, r1 = max(0, -dr), rows - max(0, dr)
+    c0, c1 = max(0, -dc), cols - max(0, dc)
+    if r0 < r1 and c0 < c1:
+        out[r0:r1, c0:c1] = mask[r0:r1, c0:c1] & mask[r0 + dr:r1 + dr, c0 + dc:c1 + dc]
+    return out
+
+def get_directions(game, player_id):
+    """Valid chain directions for player_id, falling back to DEFAULT_DIRECTIONS for games without rules."""
     if hasattr(game, "get_valid_directions"):
-        directions = game.get_valid_directions(target_p_id)
-    else:
-        directions = DEFAULT_DIRECTIONS
+        return game.get_valid_directions(player_id)
+    return DEFAULT_DIRECTIONS
 
-    # 3. Calculate Chain Length
-    for r in range(rows):
-        for c in range(cols):
-            if board[r, c] != player_val: 
-                continue
-            for dr, dc in directions:
-                length = 1
-                rr, cc = r + dr, c + dc
-                while 0 <= rr < rows and 0 <= cc < cols and board[rr, cc] == player_val:
-                    length += 1
-                    rr += dr; cc += dc
-                best = max(best, length)
+def longest_chain_on_board(board, player_val, directions):
+    """
+    Return max contiguous stones for `player_val` on a board from extract_board.
+    player_val: 1 for current player, -1 for opponent (relative to state.current_player)
+    directions: (dr, dc) steps the player's chains may run along
+    """
+    mask = board == player_val
+    if not mask.any():
+        return 0
+
+    best = 0
+    for dr, dc in directions:
+        # runs[r, c] is True while a run of `length` stones starts at (r, c);
+        # a run of length+1 starts there iff runs of `length` start at both
+        # (r, c) and (r+dr, c+dc).
+        runs = mask
+        length = 1
+        while True:
+            runs = _and_shifted(runs, dr, dc)
+            if not runs.any():
+                break
+            length += 1
+        best = max(best, length)
     return best
 
-def generate_all_states(ds, state, visited, num_turns, game, max_depth=None, pbar=None):
+def state_key(state, symmetries=None):
     """
-    Recursively visits states. 
-    Added max_depth optional parameter to prevent infinite recursion on larger boards.
-    Added pbar to track progress.
+    Hashable key identifying a position for de-duplication.
+    MNKGameState keys on its raw board bytes plus turn bookkeeping; other games fall back to str(state)
+    (pyspiel's serialize() encodes the move history, so it would not merge transpositions).
+    symmetries: optional permutations from MNKGame.board_symmetries(); the key is then the smallest
+    transformed board, so all symmetric positions share one key.
     """
-    key = str(state) 
-    if key in visited or state.is_terminal():
-        return
-        
-    if max_depth is not None and num_turns > max_depth:
-        return
-    
-    # Calculate chains
-    len_chain_me = longest_chain(state, 1, game)
-    len_chain_opp = longest_chain(state, -1, game)
+    if isinstance(state, MNKGameState):
+        turn = bytes((state._current_player, state._moves_remaining_in_turn))
+        if symmetries is not None:
+            return min(board.tobytes() for board in state._board.ravel()[symmetries]) + turn
+        return state._board.tobytes() + turn
+    return str(state)
 
-    info = {
+def state_info(state, num_turns, game, directions):
+    """The dataset record (dict) for a non-terminal state. directions: per-player direction lists."""
+    board = extract_board(state, game)
+    current_p_id = state.current_player()
+    len_chain_me = longest_chain_on_board(board, 1, directions[current_p_id])
+    len_chain_opp = longest_chain_on_board(board, -1, directions[1 - current_p_id])
+
+    return {
         'state': state.clone(),
         'longest_chain_me': len_chain_me,
         'longest_chain_opp': len_chain_opp,
@@ -94,26 +119,273 @@ def generate_all_states(ds, state, visited, num_turns, game, max_depth=None, pba
         'winning': len_chain_me > len_chain_opp, 
         'tied': len_chain_me == len_chain_opp,
         'losing': len_chain_me < len_chain_opp,
-        'current_player': state.current_player(),
+        'current_player': current_p_id,
         'num_turns': num_turns 
     }
-    
-    visited[key] = info
-    ds.add(info)
-    
-    # Update progress bar
-    if pbar is not None:
-        pbar.update(1)
 
-    for a in state.legal_actions():
-        child = state.clone()
-        child.apply_action(a)
-        generate_all_states(ds, child, visited, num_turns + 1, game, max_depth, pbar)
+def generate_all_states(ds, state, visited, num_turns, game, max_depth=None, pbar=None, directions=None, symmetries=None):
+    """
+    Visits all states reachable from `state` depth-first, using an explicit stack instead of recursion.
+    Added max_depth optional parameter to prevent infinite recursion on larger boards.
+    Added pbar to track progress.
+    directions: per-player direction lists, looked up once up front.
+    symmetries: board permutations (see state_key); when given, only one state per symmetry class is kept and expanded.
+    ds may be None to only fill `visited` (key -> info).
+    """
+    if directions is None:
+        directions = (get_directions(game, 0), get_directions(game, 1))
+
+    stack = [(state, num_turns)]
+    while stack:
+        state, num_turns = stack.pop()
+
+        key = state_key(state, symmetries)
+        if key in visited or state.is_terminal():
+            continue
+
+        if max_depth is not None and num_turns > max_depth:
+            continue
+
+        info = state_info(state, num_turns, game, directions)
+        visited[key] = info
+        if ds is not None:
+            ds.add(info)
+
+        # Update progress bar
+        if pbar is not None:
+            pbar.update(1)
+
+        # Push in reverse so children pop in legal-action order (same visit order as the recursive walk)
+        for a in reversed(state.legal_actions()):
+            child = state.clone()
+            child.apply_action(a)
+            stack.append((child, num_turns + 1))
+
+def _subtree_worker(task):
+    """Pool worker: generate every state under one frontier state and return its visited dict."""
+    state, num_turns, game, max_depth, symmetries = task
+    visited = {}
+    generate_all_states(None, state, visited, num_turns, game, max_depth, symmetries=symmetries)
+    return visited
+
+def generate_all_states_parallel(ds, state, visited, num_turns, game, num_workers, max_depth=None, pbar=None, symmetries=None):
+    """
+    generate_all_states split across a multiprocessing.Pool. The top of the tree is expanded breadth-first
+    in this process until the frontier has at least num_workers states; each frontier state's subtree is then
+    generated by a worker and the returned visited dicts are merged (first key wins).
+    Subtrees overlap wherever move orders transpose, so workers repeat some work that the serial walk shares.
+    """
+    directions = (get_directions(game, 0), get_directions(game, 1))
+
+    frontier = [(state, num_turns)]
+    while frontier and len(frontier) < num_workers:
+        next_frontier = []
+        for state, num_turns in frontier:
+            key = state_key(state, symmetries)
+            if key in visited or state.is_terminal():
+                continue
+            if max_depth is not None and num_turns > max_depth:
+                continue
+            info = state_info(state, num_turns, game, directions)
+            visited[key] = info
+            ds.add(info)
+            if pbar is not None:
+                pbar.update(1)
+            for a in state.legal_actions():
+                child = state.clone()
+                child.apply_action(a)
+                next_frontier.append((child, num_turns + 1))
+        frontier = next_frontier
+
+    # One task per distinct frontier position
+    tasks = {}
+    for state, num_turns in frontier:
+        key = state_key(state, symmetries)
+        if key not in visited:
+            tasks.setdefault(key, (state, num_turns, game, max_depth, symmetries))
+
+    with multiprocessing.Pool(num_workers) as pool:
+        for sub_visited in pool.imap(_subtree_worker, tasks.values()):
+            for key, info in sub_visited.items():
+                if key not in visited:
+                    visited[key] = info
+                    ds.add(info)
+                    if pbar is not None:
+                        pbar.update(1)
+
+
+# Scalar fields of each state dict, mirrored as NumPy columns so filter() can compare whole arrays
+COLUMN_DTYPES = {
+    'longest_chain_me': np.int16,
+    'longest_chain_opp': np.int16,
+    'freespace': np.int16,
+    'winning': np.bool_,
+    'tied': np.bool_,
+    'losing': np.bool_,
+    'current_player': np.int8,
+    'num_turns': np.int16,
+}
+
+# One row of the COLUMN_DTYPES fields, for consumers that want whole numeric records rather than state dicts
+RECORD_DTYPE = np.dtype(list(COLUMN_DTYPES.items()))
+
+def build_columns(items):
+    """Column arrays (field name -> ndarray) for the COLUMN_DTYPES fields of a list of state dicts."""
+    return {
+        name: np.fromiter((x[name] for x in items), dtype=dtype, count=len(items))
+        for name, dtype in COLUMN_DTYPES.items()
+    }
+
+def build_records(columns, indices):
+    """Contiguous RECORD_DTYPE array holding the given rows of build_columns() output."""
+    records = np.empty(len(indices), dtype=RECORD_DTYPE)
+    for name in RECORD_DTYPE.names:
+        records[name] = columns[name][indices]
+    return records
+
+
+_COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+    ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+_ARITH_OPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul}
+_NUMERIC = (bool, int, float)
+_COLUMN_PREDICATES = {}  # predicate source -> column_predicate() result
+
+def _numeric_literal(node):
+    """Value of a numeric constant node (including a negated one like -1), else None."""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        value = _numeric_literal(node.operand)
+        return None if value is None else (-value if isinstance(node.op, ast.USub) else value)
+    if isinstance(node, ast.Constant) and isinstance(node.value, _NUMERIC):
+        return node.value
+    return None
+
+def _as_number(value):
+    """Column values widened to int64/float64 so arithmetic matches Python ints (no int16 wraparound, bools count as 0/1)."""
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float64 if value.dtype.kind == 'f' else np.int64)
+    return value
+
+def _column_expr(node, arg, bare=False):
+    """
+    (columns, indices) -> array/scalar closure for a predicate AST node, or None if it can't be evaluated on columns.
+    arg is the lambda's parameter name; with bare=True, plain names like `num_turns` also refer to columns.
+    """
+    value = _numeric_literal(node)
+    if value is not None:
+        return lambda cols, idx: value
+    if isinstance(node, ast.Constant):
+        return None
+
+    if bare and isinstance(node, ast.Name) and node.id != arg:
+        name = node.id
+        return (lambda cols, idx: cols[name][idx]) if name in COLUMN_DTYPES else None
+
+    # x['name'] or x.get('name'[, default]); every item carries every column, so the default never applies
+    name = None
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id == arg:
+        key = node.slice
+        name = key.value if isinstance(key, ast.Constant) else None
+    elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == 'get'
+          and isinstance(node.func.value, ast.Name) and node.func.value.id == arg
+          and 1 <= len(node.args) <= 2 and not node.keywords and isinstance(node.args[0], ast.Constant)):
+        name = node.args[0].value
+    if name is not None:
+        if name not in COLUMN_DTYPES:
+            return None
+        return lambda cols, idx: cols[name][idx]
+
+    if isinstance(node, ast.Compare):
+        left = _column_expr(node.left, arg, bare)
+        if left is None:
+            return None
+        if len(node.ops) == 1 and isinstance(node.ops[0], (ast.In, ast.NotIn)):
+            if not isinstance(node.comparators[0], (ast.List, ast.Tuple, ast.Set)):
+                return None
+            values = [_numeric_literal(e) for e in node.comparators[0].elts]
+            if any(v is None for v in values):
+                return None
+            invert = isinstance(node.ops[0], ast.NotIn)
+            return lambda cols, idx: np.isin(left(cols, idx), values, invert=invert)
+        if not all(type(op) in _COMPARE_OPS for op in node.ops):
+            return None
+        operands = [left] + [_column_expr(c, arg, bare) for c in node.comparators]
+        if any(o is None for o in operands):
+            return None
+        ops = [_COMPARE_OPS[type(op)] for op in node.ops]
+        def compare(cols, idx):
+            # a < b < c is (a < b) and (b < c)
+            values = [o(cols, idx) for o in operands]
+            result = True
+            for op, a, b in zip(ops, values, values[1:]):
+                result = np.logical_and(result, op(a, b))
+            return result
+        return compare
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_column_expr(v, arg, bare) for v in node.values]
+        if any(p is None for p in parts):
+            return None
+        reduce = np.logical_and.reduce if isinstance(node.op, ast.And) else np.logical_or.reduce
+        # Constant operands evaluate to scalars, so every part is broadcast to the row count before reducing
+        return lambda cols, idx: reduce(
+            [np.broadcast_to(np.asarray(p(cols, idx), dtype=bool), idx.shape) for p in parts]
+        )
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _ARITH_OPS:
+        left, right = _column_expr(node.left, arg, bare), _column_expr(node.right, arg, bare)
+        if left is None or right is None:
+            return None
+        op = _ARITH_OPS[type(node.op)]
+        return lambda cols, idx: op(_as_number(left(cols, idx)), _as_number(right(cols, idx)))
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        inner = _column_expr(node.operand, arg, bare)
+        return None if inner is None else (lambda cols, idx: np.logical_not(inner(cols, idx)))
+
+    return None
+
+def column_predicate(src):
+    """
+    Vectorised form of a predicate string like "lambda x: x.get('num_turns', 0) >= 6", or a bare
+    expression over column names like "num_turns >= 6 and not tied": a function
+    (columns, indices) -> bool mask over `indices`, or None unless the predicate only uses COLUMN_DTYPES
+    fields, numeric constants, + - *, comparisons, `in` over literal lists, and and/or/not.
+    Both outcomes are cached per source string.
+    """
+    if src in _COLUMN_PREDICATES:
+        return _COLUMN_PREDICATES[src]
+    fn = None
+    try:
+        tree = ast.parse(src.strip(), mode='eval').body
+    except SyntaxError:
+        tree = None
+    if isinstance(tree, ast.Lambda) and len(tree.args.args) == 1 and not (
+        tree.args.vararg or tree.args.kwarg or tree.args.kwonlyargs or tree.args.defaults or tree.args.posonlyargs
+    ):
+        expr = _column_expr(tree.body, tree.args.args[0].arg)
+    elif tree is not None and not isinstance(tree, ast.Lambda):
+        # Bare expressions are otherwise wrapped as `lambda x: ...`, so `x` keeps meaning the state dict
+        expr = _column_expr(tree, 'x', bare=True)
+    else:
+        expr = None
+    if expr is not None:
+        def fn(cols, idx, expr=expr):
+            return np.broadcast_to(np.asarray(expr(cols, idx), dtype=bool), idx.shape)
+    _COLUMN_PREDICATES[src] = fn
+    return fn
 
 
 class GameStateDataset:
-    def __init__(self, game: pyspiel.Game, max_depth_limit=None, cache_file=None):
+    def __init__(self, game: pyspiel.Game, max_depth_limit=None, cache_file=None, use_symmetries=False, num_workers=None):
+        """
+        use_symmetries: keep one representative per rotation/reflection class (MNKGame only).
+        num_workers: generate subtrees in this many processes (default: serial). Order of items then differs from a serial run.
+        """
         self._items = []    # list of dicts
+        self._columns = None  # COLUMN_DTYPES arrays parallel to _items, built on first query
         self.game = game
         self.max_depth_limit = max_depth_limit
         self.cache_file = cache_file
@@ -128,9 +400,15 @@ class GameStateDataset:
         # Start generation if no cache or load failed
         print(f"Generating states for {game}...")
         visited = {}
+        symmetries = game.board_symmetries() if use_symmetries and hasattr(game, "board_symmetries") else None
         
         with tqdm(desc="Generating States", unit=" states") as pbar:
-            generate_all_states(self, game.new_initial_state(), visited, 0, game, max_depth=max_depth_limit, pbar=pbar)
+            if num_workers and num_workers > 1:
+                generate_all_states_parallel(self, game.new_initial_state(), visited, 0, game, num_workers,
+                                             max_depth=max_depth_limit, pbar=pbar, symmetries=symmetries)
+            else:
+                generate_all_states(self, game.new_initial_state(), visited, 0, game, max_depth=max_depth_limit, pbar=pbar,
+                                    symmetries=symmetries)
             
         print(f"Generated {len(self._items)} unique non-terminal states.")
         
@@ -141,6 +419,7 @@ class GameStateDataset:
     def add(self, info):
         """info is the dict you are currently putting in visited[key]"""
         self._items.append(info)
+        self._columns = None
 
     def save(self):
         """Save the dataset items to a pickle file."""
@@ -156,82 +435,153 @@ class GameStateDataset:
         try:
             with open(self.cache_file, 'rb') as f:
                 self._items = pickle.load(f)
+            self._columns = None
             return True
         except Exception as e:
             print(f"Error loading cache: {e}")
             return False
 
+    @property
+    def columns(self):
+        if self._columns is None:
+            self._columns = build_columns(self._items)
+        return self._columns
+
     # --- Query builder ----------------------------------------------------
+    def view(self, rng=None):
+        """All states as a GameStateView backed by this dataset's columns. rng: seed or np.random.Generator for sampling."""
+        return GameStateView(self._items, columns=self.columns, rng=rng)
+
     def filter(self, **kwargs):
-        out = []
-        for x in self._items:
-            try:
-                if all(x.get(k) == v for k, v in kwargs.items()):
-                    out.append(x)
-            except Exception as e:
-                continue
-        return GameStateView(out) 
+        return self.view().filter(**kwargs)
 
     def where(self, fn):
-        return GameStateView([x for x in self._items if fn(x)])
+        return self.view().where(fn)
 
     def all(self):
         return list(self._items)
 
 
 class GameStateView:
-    def __init__(self, items):
+    """
+    A subset of a dataset's state dicts, held as indices into the shared `items` list.
+    `columns` (from build_columns) lets filter() run as array comparisons; without it, filter() scans the dicts.
+    `rng` (seed or np.random.Generator) drives sample(); views derived by filter()/where() share it.
+    """
+    def __init__(self, items, indices=None, columns=None, rng=None):
         self._items = items
+        self._indices = np.arange(len(items)) if indices is None else indices
+        self._columns = columns
+        self._rng = np.random.default_rng(rng)
+        self._records = None  # RECORD_DTYPE rows for _indices, built on first records()
+
+    def _view(self, indices):
+        return GameStateView(self._items, indices, self._columns, self._rng)
 
     def filter(self, **kwargs):
+        if self._columns is not None and all(
+            k in self._columns and isinstance(v, (bool, int, float, np.generic)) for k, v in kwargs.items()
+        ):
+            mask = np.ones(len(self._indices), dtype=bool)
+            for k, v in kwargs.items():
+                mask &= self._columns[k][self._indices] == v
+            return self._view(self._indices[mask])
+
         out = []
-        for x in self._items:
+        for i in self._indices:
             try:
+                x = self._items[i]
                 if all(x.get(k) == v for k, v in kwargs.items()):
-                    out.append(x)
+                    out.append(i)
             except Exception:
                 continue
-        return GameStateView(out)
+        return self._view(np.array(out, dtype=np.intp))
 
     def where(self, fn):
-        return GameStateView([x for x in self._items if fn(x)])
+        items = self._items
+        keep = np.fromiter((bool(fn(items[i])) for i in self._indices.tolist()), dtype=bool, count=len(self._indices))
+        return self._view(self._indices[keep])
+
+    def where_columns(self, mask_fn):
+        """Like where(), for a column_predicate() result: keeps the states its mask selects in one array pass."""
+        if self._columns is None:
+            raise ValueError("where_columns() needs a view built with columns")
+        return self._view(self._indices[mask_fn(self._columns, self._indices)])
 
     def sample(self, k=1, replace=True):
-        if not self._items:
+        n = len(self._indices)
+        if not n:
             print("Warning: Trying to sample from empty dataset")
             return []
         
-        if not replace and k > len(self._items):
-            print(f"Warning: Requesting {k} samples from {len(self._items)} items without replacement. Returning all items.")
-            return random.sample(self._items, len(self._items))
+        if not replace and k > n:
+            print(f"Warning: Requesting {k} samples from {n} items without replacement. Returning all items.")
+            k = n
             
         try:
-            if replace:
-                return random.choices(self._items, k=k)   # with replacement
-            else:
-                return random.sample(self._items, k=k)    # without replacement
+            picks = self._indices[self._rng.choice(n, size=k, replace=replace)]
         except Exception as e:
             print(f"Error during sampling: {e}")
             return []
+        return [self._items[i] for i in picks]
+
+    def sampler(self, k=1, replace=True):
+        """
+        Zero-argument callable drawing k states like sample(k, replace), with the checks done once up front.
+        Draws come from this view's rng and indices as they are now.
+        """
+        items, indices, rng = self._items, self._indices, self._rng
+        n = len(indices)
+        if not n:
+            return lambda: self.sample(k, replace)
+        if not replace and k > n:
+            k = n
+        return lambda: [items[i] for i in indices[rng.choice(n, size=k, replace=replace)]]
+
+    def records(self):
+        """This view's COLUMN_DTYPES fields as one contiguous RECORD_DTYPE array, in view order."""
+        if self._records is None:
+            if self._columns is None:
+                raise ValueError("records() needs a view built with columns")
+            self._records = build_records(self._columns, self._indices)
+        return self._records
+
+    def sample_records(self, k=1, replace=True):
+        """
+        Like sample(), but returns the drawn rows as a RECORD_DTYPE array instead of state dicts
+        (same rng draws, so the rows match what sample() would have picked).
+        """
+        n = len(self._indices)
+        if not replace and k > n:
+            k = n
+        return self.records()[self._rng.choice(n, size=k, replace=replace)] if n else self.records()[:0]
+
+    @property
+    def indices(self):
+        """Positions of this view's states in the dataset, as an intp array."""
+        return self._indices
 
     def __len__(self):
-        return len(self._items)
+        return len(self._indices)
 
     def __iter__(self):
-        yield from self._items
+        for i in self._indices:
+            yield self._items[i]
 
 # --- MAIN BLOCK ---
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate and pickle game states from config.")
     parser.add_argument("--config", "-c", type=str, required=True, help="Path to config file (e.g., config/baseline.yaml)")
     parser.add_argument("--output", "-o", type=str, default=None, help="Optional output filename. If not provided, one is generated.")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Generate subtrees in this many processes (default: serial).")
+    parser.add_argument("--symmetries", action="store_true", help="Keep one state per board rotation/reflection class (mnk_game only).")
     
     args = parser.parse_args()
 
     try:
         # 1. Load Config
         with open(args.config, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
         
         game_cfg = config.get("game", {})
         game_name = game_cfg.get("name")
@@ -254,7 +604,8 @@ if __name__ == "__main__":
                 if rules.get("p0_extra_k"): variant_tag = "asymmetric_k"
                 if rules.get("opening_moves"): variant_tag = "opening_moves"
                 
-                args.output = f"dataset_mnk_{m}x{n}_k{k}_{variant_tag}.pkl"
+                symmetry_tag = "_canonical" if args.symmetries else ""
+                args.output = f"dataset_mnk_{m}x{n}_k{k}_{variant_tag}{symmetry_tag}.pkl"
                 
         else:
             game = pyspiel.load_game(game_name, params)
@@ -266,7 +617,8 @@ if __name__ == "__main__":
         print(f"Output will be saved to: {args.output}")
         # Note: Set max_depth_limit appropriately. For 4x4, depth 16 is fine. For 5x5, limit it or it will never finish.
         limit = 16 if params.get('m', 3) * params.get('n', 3) <= 16 else 10 
-        dataset = GameStateDataset(game, max_depth_limit=limit, cache_file=args.output)
+        dataset = GameStateDataset(game, max_depth_limit=limit, cache_file=args.output, use_symmetries=args.symmetries,
+                                   num_workers=args.workers)
         
     except Exception as e:
         print(f"Error: {e}")
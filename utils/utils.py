@@ -1,24 +1,21 @@
 from policies.policy_registry import instantiate_policy, POLICY_REGISTRY
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple
+from collections import defaultdict
+import ast
+import builtins
+import logging
+import types
 import pyspiel
-from state_dataset.dataset import GameStateView, GameStateDataset
+from state_dataset.dataset import GameStateView, GameStateDataset, COLUMN_DTYPES, column_predicate
 from games.mnk_game import MNKGame
 
+__all__ = ["load_game", "load_policies", "build_sampler", "generate_cache_filename", "PolicyRecord"]
 
+log = logging.getLogger(__name__)
 
 
-# def load_game(game_config: Dict[str, Any]) -> Any:
-#     """Load and initialize a game from configuration."""
-#     game_name = game_config["name"]
-    
-#     try:
-#         # Use custom game registry for custom games like mnk_game
-#         from games.registry import load_custom_game
-#         game = load_custom_game(game_config)
-#         print(f"✓ Loaded game: {game_name}")
-#         return game
-#     except Exception as e:
-#         raise RuntimeError(f"Failed to load game '{game_name}': {e}")
+# OpenSpiel games are immutable, so each (name, parameters) pair is only constructed once
+_GAME_CACHE: Dict[tuple, pyspiel.Game] = {}
 
 def load_game(game_config: Dict[str, Any]) -> pyspiel.Game:
     """Load and initialize a game from configuration."""
@@ -28,127 +25,226 @@ def load_game(game_config: Dict[str, Any]) -> pyspiel.Game:
     try:
         # --- FIX: Check for custom python games first ---
         if game_name == "mnk_game":
-            print(f"✓ Loading Custom Python Game: {game_name}")
+            log.info("✓ Loading Custom Python Game: %s", game_name)
             # Unpack parameters (m, n, k, rules) into the constructor
             return MNKGame(**game_params)
         # ------------------------------------------------
         
         # Fallback to standard OpenSpiel C++ games
-        if game_params:
-            game = pyspiel.load_game(game_name, game_params)
-        else:
-            game = pyspiel.load_game(game_name)
+        key = (game_name, tuple(sorted(game_params.items())))
+        try:
+            hash(key)
+        except TypeError:
+            key = None  # unhashable parameter values: construct without caching
+
+        game = _GAME_CACHE.get(key) if key is not None else None
+        if game is None:
+            if game_params:
+                game = pyspiel.load_game(game_name, game_params)
+            else:
+                game = pyspiel.load_game(game_name)
+            if key is not None:
+                _GAME_CACHE[key] = game
             
-        print(f"✓ Loaded OpenSpiel game: {game_name}")
+        log.info("✓ Loaded OpenSpiel game: %s", game_name)
         return game
         
     except Exception as e:
         raise RuntimeError(f"Failed to load game '{game_name}': {e}")
 
+load_game.cache_clear = _GAME_CACHE.clear
 
 
+class PolicyRecord(NamedTuple):
+    """A loaded policy with the config entry it was built from (load_policies with include_metadata=True)."""
+    policy: Any
+    config: Dict[str, Any]
+
+def _load_inference(opponent_inference_config: Dict[str, Any], game: Any):
+    """
+    Lazy import to avoid circular dependency (opponent_inference.inference imports this module).
+    The first call rebinds this name to the imported load_inference, so later calls skip the import.
+    """
+    global _load_inference
+    from opponent_inference.inference import load_inference
+    _load_inference = load_inference
+    return load_inference(opponent_inference_config, game)
+
 def load_policies(policies_config: List[Dict[str, Any]], game: Any, include_metadata=True) -> Dict[str, Any]:
     """Load and initialize policies from configuration with two-stage opponent inference setup."""
     policies = {}
     pending_inference_configs = {}
+    name_counts = defaultdict(int)  # loaded policies per name, for duplicate suffixes
     
-    print(f"\nAvailable policies: {list(POLICY_REGISTRY.keys())}")
-    print("Loading policies (Stage 1 - without opponent inference):")
+    if log.isEnabledFor(logging.INFO):
+        log.info("Available policies: %s", list(POLICY_REGISTRY))
+    log.info("Loading policies (Stage 1 - without opponent inference):")
     
     # Stage 1: Create all policies WITHOUT opponent inference
-    for i, policy_config in enumerate(policies_config):
+    for policy_config in policies_config:
+        # Unknown names (KeyError) and bad parameters skip the policy; anything else is a real bug and propagates
         try:
-            # Add the game parameter to policy config
-            policy_config_with_game = policy_config.copy()
-            if "parameters" not in policy_config_with_game:
-                policy_config_with_game["parameters"] = {}
-            policy_config_with_game["parameters"]["game"] = game
-            
-            # Remove opponent_inference from parameters temporarily
-            policy_params = policy_config_with_game["parameters"].copy()
+            # Add the game parameter and hold back opponent_inference, without touching the caller's config.
+            # A bare `parameters:` key in YAML loads as None.
+            policy_params = {**(policy_config.get("parameters") or {}), "game": game}
             opponent_inference_config = policy_params.pop('opponent_inference', None)
-            policy_config_with_game["parameters"] = policy_params
-            
+            policy_config_with_game = {**policy_config, "parameters": policy_params}
+
             policy = instantiate_policy(policy_config_with_game)
-            policy_name = policy_config["name"]
-            policy_id = f"{policy_name}_{i}" if policy_name in policies else policy_name
-        
-            if include_metadata:
-                policies[policy_id] = {
-                    "policy": policy,
-                    "config": policy_config
-                }
-            else:
-                policies[policy_id] = policy
-            
-            # Store opponent inference config for later
-            if opponent_inference_config:
-                pending_inference_configs[policy_id] = opponent_inference_config
-                
-            print(f"  ✓ {policy_id}: {policy.__class__.__name__}")
-            
-        except Exception as e:
-            policy_name = policy_config.get("name", "unknown")
-            print(f"  ✗ Failed to load policy '{policy_name}': {e}")
+        except (KeyError, TypeError, ValueError, RuntimeError) as e:
+            log.warning("  ✗ Failed to load policy '%s': %s", policy_config.get("name", "unknown"), e)
             continue
+
+        policy_name = policy_config["name"]
+        # Duplicates are numbered in load order: name, name_1, name_2, ...
+        n = name_counts[policy_name]
+        name_counts[policy_name] += 1
+        policy_id = f"{policy_name}_{n}" if n else policy_name
+
+        if include_metadata:
+            policies[policy_id] = PolicyRecord(policy, policy_config)
+        else:
+            policies[policy_id] = policy
+
+        # Store opponent inference config for later
+        if opponent_inference_config:
+            pending_inference_configs[policy_id] = opponent_inference_config
+
+        log.info("  ✓ %s: %s", policy_id, policy.__class__.__name__)
     
     if not policies:
         raise RuntimeError("No policies were successfully loaded")
     
     # Stage 2: Set up opponent inference for policies that need it
     if pending_inference_configs:
-        print("\nSetting up opponent inference (Stage 2):")
+        log.info("Setting up opponent inference (Stage 2):")
         for policy_id, opponent_inference_config in pending_inference_configs.items():
             if opponent_inference_config.get('enabled', False):
                 try:
-                    # Lazy import to avoid circular dependency
-                    from opponent_inference.inference import load_inference
-                    
                     # Get the actual policy object
                     if include_metadata:
-                        policy_obj = policies[policy_id]["policy"]
+                        policy_obj = policies[policy_id].policy
                     else:
                         policy_obj = policies[policy_id]
                     
-                    # Create opponent inference with all available policies
-                    opponent_inference = load_inference(opponent_inference_config, game)
-                    
-                    # Inject it into the policy (assuming we add this method)
-                    if hasattr(policy_obj, 'set_opponent_inference'):
-                        policy_obj.set_opponent_inference(opponent_inference)
-                        print(f"  ✓ {policy_id}: Opponent inference enabled")
-                    else:
-                        print(f"  ⚠ {policy_id}: Policy doesn't support opponent inference")
+                    # Looked up on the class so instance attributes and __getattr__ hooks are never consulted
+                    set_opponent_inference = getattr(type(policy_obj), 'set_opponent_inference', None)
+                    if set_opponent_inference is None:
+                        log.warning("  ⚠ %s: Policy doesn't support opponent inference", policy_id)
+                        continue
+
+                    # Create opponent inference with all available policies and inject it
+                    opponent_inference = _load_inference(opponent_inference_config, game)
+                    set_opponent_inference(policy_obj, opponent_inference)
+                    log.info("  ✓ %s: Opponent inference enabled", policy_id)
                         
                 except Exception as e:
-                    print(f"  ✗ {policy_id}: Failed to set up opponent inference: {e}")
+                    log.warning("  ✗ %s: Failed to set up opponent inference: %s", policy_id, e)
     
     return policies
 
 
+# Compiled sampler predicates, keyed by their config source string
+_PRED_CACHE: Dict[str, types.CodeType] = {}
+# Predicates are evaluated against these globals only: no imports, file access, etc.
+_PRED_GLOBALS = {"__builtins__": {name: getattr(builtins, name) for name in (
+    "abs", "all", "any", "bool", "float", "int", "len", "max", "min", "round", "sum",
+)}}
 
-def generate_cache_filename(game_config: Dict[str, Any]) -> str:
-    """Generate a cache filename based on game configuration."""
-    game_name = game_config["name"]
-    params = game_config.get("parameters", {})
+def _compile_predicate(p: str):
+    """
+    Callable for a predicate string: either a `lambda x: ...` or a bare expression over `x` and
+    column names (e.g. "num_turns >= 6 and x['state'] is not None"), matching column_predicate().
+    """
+    code = _PRED_CACHE.get(p)
+    if code is None:
+        if p.lstrip().startswith("lambda"):
+            src = p
+        else:
+            body = p.strip()
+            names = sorted({node.id for node in ast.walk(ast.parse(body, mode="eval"))
+                            if isinstance(node, ast.Name) and node.id in COLUMN_DTYPES})
+            if names:
+                # Bind each referenced column name to the state dict's field of the same name
+                body = f"(lambda {', '.join(names)}: ({body}))({', '.join(f'x[{n!r}]' for n in names)})"
+            src = f"lambda x: {body}"
+        code = _PRED_CACHE[p] = compile(src, "<predicate>", "eval")
+    return eval(code, _PRED_GLOBALS)
+
+def _all_of(fns):
+    """Fuse predicates into one callable that short-circuits on the first failing predicate."""
+    fns = tuple(fns)
+    if len(fns) == 1:
+        return fns[0]
+    def combined(x):
+        for fn in fns:
+            if not fn(x):
+                return False
+        return True
+    return combined
+
+# Shared read-only defaults for missing sampler config sections
+_EMPTY = types.MappingProxyType({})
+_EMPTY_L = ()
+
+def build_sampler(cfg, game, cache_file=None) -> GameStateView:
+    """Dataset view filtered by cfg["sampler"]["predicates"], with `samples()` drawing cfg["sampler"]["sample"]."""
+    # Pass the game instance and cache file to the dataset generator
+    ds = GameStateDataset(game, cache_file=cache_file)
+    scfg = cfg.get("sampler", _EMPTY)
     
-    if game_name == "mnk_game":
-        m, n, k = params.get('m'), params.get('n'), params.get('k')
-        rules = params.get('rules', {})
-        
-        # Determine specific variant tag
-        variant_tag = "standard"
-        if rules.get("allowed_directions"): 
-            variant_tag = "restricted"
-        if rules.get("p0_extra_k"): 
-            variant_tag = "asymmetric_k"
-        if rules.get("opening_moves"): 
-            variant_tag = "opening_moves"
+    view = ds.view()
+    
+    log.info("Initial dataset size: %d", len(view))
         
-        return f"state_dataset/pkl/dataset_mnk_{m}x{n}_k{k}_{variant_tag}.pkl"
+    # Predicates over dataset columns run as NumPy masks; the rest are compiled up front
+    # and applied to the survivors in a single pass
+    compiled = []
+    for p in scfg.get("predicates", _EMPTY_L):
+        mask_fn = column_predicate(p) if isinstance(p, str) else None
+        if mask_fn is not None:
+            try:
+                view = view.where_columns(mask_fn)
+                continue
+            except Exception as e:
+                # Leave it to the Python path below, which applies it or warns and skips it
+                log.debug("Column evaluation of predicate '%s' failed, using the Python path: %s", p, e)
+        try:
+            fn = p if callable(p) else _compile_predicate(p)
+            compiled.append((p, fn))
+        except Exception as e:
+            log.warning("Failed to apply predicate '%s': %s", p, e)
+
+    if compiled:
+        try:
+            view = view.where(_all_of(fn for _, fn in compiled))
+        except Exception:
+            # Re-apply one at a time so only the predicate(s) that raise are skipped
+            for p, fn in compiled:
+                try:
+                    view = view.where(fn)
+                except Exception as e:
+                    log.warning("Failed to apply predicate '%s': %s", p, e)
+
+    n = len(view)
+    log.info("After predicates: %d items", n)
+
+    # read sampling parameters
+    sample_cfg = scfg.get("sample", _EMPTY)
+    k, replace = sample_cfg.get("k", 1), sample_cfg.get("replace", True)
     
-    # Default fallback for other games
-    return f"state_dataset/pkl/dataset_{game_name}.pkl"
+    log.info("Sampling k=%s, replace=%s", k, replace)
+    
+    # Safety check for sampling
+    if not replace and k > n:
+        log.warning("Cannot sample %s items without replacement from %d items. Using replacement instead.", k, n)
+        replace = True
+    
+    # Attach sampling function
+    view.samples = view.sampler(k=k, replace=replace)
+
+    return view
+
 
 def generate_cache_filename(game_config: Dict[str, Any]) -> str:
     """Generate a cache filename based on game configuration."""
@@ -171,46 +267,4 @@ def generate_cache_filename(game_config: Dict[str, Any]) -> str:
         return f"state_dataset/pkl/dataset_mnk_{m}x{n}_k{k}_{variant_tag}.pkl"
     
     # Default fallback for other games
-    return f"state_dataset/pkl/dataset_{game_name}.pkl" 
-
-
-
-# def load_policies(policies_config: List[Dict[str, Any]], game: pyspiel.Game) -> Dict[str, Any]:
-#     """Load and initialize policies from configuration."""
-#     policies = {}
-    
-#     print(f"\nAvailable policies: {list(POLICY_REGISTRY.keys())}")
-#     print("Loading policies:")
-    
-#     for i, policy_config in enumerate(policies_config):
-#         try:
-#             # Create a copy to inject the game instance
-#             policy_config_with_game = policy_config.copy()
-#             if "parameters" not in policy_config_with_game:
-#                 policy_config_with_game["parameters"] = {}
-#             policy_config_with_game["parameters"]["game"] = game
-            
-#             policy = instantiate_policy(policy_config_with_game)
-#             policy_name = policy_config["name"]
-            
-#             # Handle duplicate names (e.g. random vs random)
-#             policy_id = f"{policy_name}_{i}" if policy_name in policies else policy_name
-        
-#             # Store the wrapper dict that analysis.py expects
-#             policies[policy_id] = {
-#                 "policy": policy,
-#                 "config": policy_config
-#             }
-#             print(f"  ✓ {policy_id}: {policy.__class__.__name__}")
-            
-#         except Exception as e:
-#             policy_name = policy_config.get("name", "unknown")
-#             print(f"  ✗ Failed to load policy '{policy_name}': {e}")
-#             import traceback
-#             traceback.print_exc()
-#             continue
-    
-#     if not policies:
-#         raise RuntimeError("No policies were successfully loaded")
-    
-#     return policies
\ No newline at end of file
+    return f"state_dataset/pkl/dataset_{game_name}.pkl"
@@ -1,4 +1,5 @@
 import argparse
+import logging
 import yaml
 import numpy as np
 import pandas as pd
@@ -8,6 +9,11 @@ import copy
 from policies.intuitivegamer.policy import IntuitiveGamerPolicy
 from utils.utils import load_game, load_policies, build_sampler
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 
 
 def get_random_start_states(game, num_states=50, max_random_moves=6):
@@ -158,10 +164,11 @@ def main():
                         help="Path to save results CSV")
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     try:
         with open(args.config, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
         
         results_df = run_parameter_search(config)
         